@@ -1,11 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import Dict
+from itertools import chain
 from recommendation_engine_v3 import CodeErrorRecommendationEngine
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 app = FastAPI()
 
+# Shared across requests so the engine's analysis cache is reused
+engine = CodeErrorRecommendationEngine()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,8 +33,19 @@ class DebugResponse(BaseModel):
 @app.post("/debug", response_model=DebugResponse)
 def debug_code(data: DebugRequest):
     try:
-        engine = CodeErrorRecommendationEngine()
         result = engine.debugg(data.code, data.log)
         return DebugResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/debug/stream")
+def debug_code_stream(data: DebugRequest):
+    # Streams only the corrected code, so clients can render it as it arrives.
+    # The first chunk is fetched up front so setup errors (e.g. a missing API
+    # key) return a 500 like /debug instead of a truncated 200
+    try:
+        chunks = engine.debugg_stream(data.code, data.log)
+        first_chunk = next(chunks, "")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(chain([first_chunk], chunks), media_type="text/plain")
@@ -1,8 +1,128 @@
-import re
-from typing import Dict, List, Optional
+import ast
+import difflib
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import symtable
+import sys
+import threading
+import time
+from collections import Counter
+from typing import ClassVar, Dict, Iterator, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 from enum import Enum
-from google import genai
+from types import MappingProxyType
+
+# RE2 is opt-in (CODE_DEBUGGER_RE2=1): it guarantees linear-time matching but
+# is slower than re on these patterns, and its \w only matches ASCII, so
+# non-ASCII identifiers are not extracted. Patterns below use inline flags
+# and no lookaround so they compile under either engine.
+if os.environ.get("CODE_DEBUGGER_RE2") == "1":
+    import re2 as re
+else:
+    import re
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Read once at import; only needed once debugg actually calls Gemini
+_API_KEY = os.environ.get("GEMINI_API_KEY")
+
+# SQLite file caching debugg results across runs; set CODE_DEBUGGER_CACHE to
+# an empty string to disable it
+RESPONSE_CACHE_PATH = os.path.expanduser(
+    os.environ.get("CODE_DEBUGGER_CACHE", "~/.cache/code_debugger/responses.sqlite3")
+)
+RESPONSE_CACHE_TTL = 24 * 60 * 60  # seconds
+
+@lru_cache(maxsize=None)
+def _get_genai_client():
+    """Return the Gemini client shared by every engine, created on first use"""
+    # Imported here so the analysis engine doesn't pull in the Gemini SDK
+    import httpx
+    from google import genai
+
+    if not _API_KEY:
+        raise RuntimeError("Set the GEMINI_API_KEY environment variable to generate corrected code")
+
+    # Size the connection pool for concurrent and batched calls, and
+    # multiplex them over HTTP/2 when the h2 package is installed
+    client_args = {
+        "limits": httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        "http2": importlib.util.find_spec("h2") is not None,
+    }
+    return genai.Client(
+        api_key=_API_KEY,
+        http_options={"client_args": client_args, "async_client_args": client_args}
+    )
+
+def _response_cache_key(code: str, log: str) -> str:
+    """Key a debugg result by its inputs and the model that produced it"""
+    return hashlib.sha256(f"{code}\0{log}\0{GEMINI_MODEL}".encode()).hexdigest()
+
+# Guards the shared connection, which FastAPI may use from several threads
+_response_cache_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
+def _get_response_cache() -> sqlite3.Connection:
+    """Return the response cache connection, opening it and its table on first use"""
+    cache_dir = os.path.dirname(RESPONSE_CACHE_PATH)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    connection = sqlite3.connect(RESPONSE_CACHE_PATH, check_same_thread=False)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+    return connection
+
+def _read_cached_response(key: str) -> Optional[dict]:
+    """Return a cached debugg result, or None on a miss or expired entry"""
+    if not RESPONSE_CACHE_PATH:
+        return None
+    try:
+        with _response_cache_lock:
+            row = _get_response_cache().execute(
+                "SELECT value FROM responses WHERE key = ? AND created > ?",
+                (key, time.time() - RESPONSE_CACHE_TTL)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.warning("Response cache read failed: %s", e)
+        return None
+
+def _write_cached_response(key: str, result: dict) -> None:
+    """Store a debugg result in the response cache"""
+    if not RESPONSE_CACHE_PATH:
+        return
+    try:
+        now = time.time()
+        with _response_cache_lock, _get_response_cache() as connection:
+            # Expired rows are never read again, so drop them as new ones arrive
+            connection.execute("DELETE FROM responses WHERE created <= ?", (now - RESPONSE_CACHE_TTL,))
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(result), now)
+            )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Response cache write failed: %s", e)
+
+# Structured output for the corrected code, so replies never arrive wrapped
+# in markdown fences or prose
+_CORRECTION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {"corrected_code": {"type": "STRING"}},
+        "required": ["corrected_code"],
+    },
+}
 
 class ErrorSeverity(Enum):
     CRITICAL = "Critical"
@@ -17,69 +137,95 @@ class ErrorClassification(Enum):
     SEMANTIC = "semantic"
     UNKNOWN = "unknown"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ErrorInfo:
     error_type: str
     line_number: Optional[int]
-    variables: List[str]
+    variables: Tuple[str, ...]
     full_message: str
     classification: ErrorClassification
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CodeInfo:
     language: str
     error_block: str
-    error_lines: List[str]
+    error_lines: Tuple[str, ...]
     intent: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RecommendationResult:
     explanation: str
     severity: ErrorSeverity
     impact: str
-    proposed_fixes: List[Dict[str, str]]
-    best_practices: List[str]
+    proposed_fixes: Tuple[Mapping[str, str], ...]
+    best_practices: Tuple[str, ...]
     priority_reasoning: str
 
 class ErrorLogAnalyzer:
     """Extracts structured information from error logs"""
     
     def __init__(self):
-        self.error_patterns = {
-            # Python patterns
-            r'(\w+Error): (.+) at line (\d+)': ('python', 'runtime'),
-            r'(\w+Error): (.+)': ('python', 'runtime'),
-            r'(\w+Exception): (.+)': ('python', 'runtime'),
-            r'SyntaxError: (.+) at line (\d+)': ('python', 'syntax'),
-            r'File "(.+)", line (\d+), in (.+)\n\s*(.+)\n(\w+Error): (.+)': ('python', 'runtime'),
-            r'json\.decoder\.JSONDecodeError: (.+)': ('python', 'runtime'),
+        # Each pattern is gated on a lowercase literal it cannot match without.
+        # Patterns for messages that start a log line are anchored with ^
+        error_patterns = [
+            # Python patterns (the first also covers JavaScript, the third Java)
+            (r'(\w+Error): (.+) at line (\d+)', 'error', 'runtime'),
+            (r'(\w+Error): (.+)', 'error', 'runtime'),
+            (r'(\w+Exception): (.+)', 'exception', 'runtime'),
+            (r'^SyntaxError: (.+) at line (\d+)', 'syntaxerror', 'syntax'),
+            (r'^\s*File "(.+)", line (\d+), in (.+)\n\s*(.+)\n(\w+Error): (.+)', 'error', 'runtime'),
+            (r'json\.decoder\.JSONDecodeError: (.+)', 'jsondecodeerror', 'runtime'),
             
             # Java patterns  
-            r'Exception in thread "(.+)" (\w+Exception): (.+) at (.+):(\d+)': ('java', 'runtime'),
-            r'(\w+Exception): (.+)': ('java', 'runtime'),
+            (r'Exception in thread "(.+)" (\w+Exception): (.+) at (.+):(\d+)', 'exception in thread', 'runtime'),
             
             # JavaScript patterns
-            r'(\w+Error): (.+) at line (\d+)': ('javascript', 'runtime'),
-            r'ReferenceError: (.+) is not defined': ('javascript', 'runtime'),
-            r'TypeError: (.+)': ('javascript', 'runtime'),
+            (r'ReferenceError: (.+) is not defined', 'referenceerror', 'runtime'),
+            (r'TypeError: (.+)', 'typeerror', 'runtime'),
             
             # C/C++ patterns
-            r'error: (.+) at line (\d+)': ('c', 'syntax'),
-            r'segmentation fault': ('c', 'runtime'),
-        }
+            # Compilers and build tools put varying prefixes before 'error:', so
+            # this one is not anchored
+            (r'error: (.+) at line (\d+)', 'error:', 'syntax'),
+            (r'segmentation fault', 'segmentation fault', 'runtime'),
+        ]
+        self.error_patterns = [
+            (re.compile('(?im)' + pattern), literal, classification)
+            for pattern, literal, classification in error_patterns
+        ]
+        
+        # Common patterns for variable names. Each starts with or contains a
+        # literal the engine can scan for, which beats one combined alternation
+        self._var_patterns = [re.compile(pattern) for pattern in [
+            r"'(\w+)' is not defined",
+            r"'(\w+)' has no attribute",
+            r"cannot access '(\w+)'",
+            r"variable '(\w+)'",  # also covers "undefined variable '...'"
+        ]]
+        
+        # Line number patterns, tried in order of preference. Word boundaries
+        # keep words like 'deadline 5' or 'format 5' from matching
+        self._line_patterns = [re.compile(pattern) for pattern in [
+            r'\bline (\d+)',
+            r':(\d+):',
+            r'\bat (\d+)',
+        ]]
     
     def analyze(self, error_log: str) -> ErrorInfo:
         """Extract structured information from error log"""
         error_log = error_log.strip()
+        log_lower = error_log.lower()
         
-        # Try to match known patterns
-        for pattern, (lang, classification) in self.error_patterns.items():
-            match = re.search(pattern, error_log, re.IGNORECASE | re.MULTILINE)
+        # Try to match known patterns, skipping those whose literal is absent
+        for pattern, literal, classification in self.error_patterns:
+            if literal not in log_lower:
+                continue
+            match = pattern.search(error_log)
             if match:
                 groups = match.groups()
                 
-                # Extract error type
-                error_type = groups[0] if groups else "UnknownError"
+                # Extract error type, interned since it keys the rule lookup
+                error_type = sys.intern(groups[0]) if groups else "UnknownError"
                 
                 # Extract line number
                 line_number = None
@@ -108,34 +254,21 @@ class ErrorLogAnalyzer:
             classification=ErrorClassification.UNKNOWN
         )
     
-    def _extract_variables(self, error_log: str) -> List[str]:
+    def _extract_variables(self, error_log: str) -> Tuple[str, ...]:
         """Extract variable names from error message"""
-        # Common patterns for variable names
-        var_patterns = [
-            r"'(\w+)' is not defined",
-            r"'(\w+)' has no attribute",
-            r"cannot access '(\w+)'",
-            r"variable '(\w+)'",
-            r"undefined variable '(\w+)'",
-        ]
-        
-        variables = []
-        for pattern in var_patterns:
-            matches = re.findall(pattern, error_log)
-            variables.extend(matches)
+        # Every variable pattern is quoted
+        if "'" not in error_log:
+            return ()
         
-        return list(set(variables))  # Remove duplicates
+        # Collect into a set to remove duplicates
+        return tuple({
+            variable for pattern in self._var_patterns for variable in pattern.findall(error_log)
+        })
     
     def _extract_line_number(self, error_log: str) -> Optional[int]:
         """Extract line number from error message"""
-        line_patterns = [
-            r'line (\d+)',
-            r':(\d+):',
-            r'at (\d+)',
-        ]
-        
-        for pattern in line_patterns:
-            match = re.search(pattern, error_log)
+        for pattern in self._line_patterns:
+            match = pattern.search(error_log)
             if match:
                 return int(match.group(1))
         
@@ -144,20 +277,43 @@ class ErrorLogAnalyzer:
 class StaticCodeAnalysis:
     """Analyzes code snippet using error context"""
     
+    MAX_BLOCK_LOOKBACK = 50
+    
     def __init__(self):
-        self.language_patterns = {
+        language_patterns = {
             'python': [r'def\s+\w+', r'import\s+\w+', r'print\s*\(', r':\s*$'],
             'java': [r'public\s+class', r'System\.out\.print', r'public\s+static\s+void\s+main'],
             'javascript': [r'function\s+\w+', r'console\.log', r'var\s+\w+', r'let\s+\w+'],
             'c': [r'#include', r'int\s+main', r'printf'],
             'cpp': [r'#include', r'std::', r'cout\s*<<'],
         }
+        self._languages = list(language_patterns)
+        
+        # Tokens shared across languages (e.g. '#include') are searched once
+        token_languages = {}
+        for lang, patterns in language_patterns.items():
+            for pattern in patterns:
+                token_languages.setdefault(pattern, []).append(lang)
+        self._language_tokens = [
+            (re.compile('(?m)' + pattern), languages)
+            for pattern, languages in token_languages.items()
+        ]
+        
+        # Keywords that signal the intent of a code block
+        self._intent_re = re.compile(
+            r'(?:^|\W)(def|function|for|while|class|if|elif|else|import|#include)\b'
+        )
+        
+        # Lines that open a logical block (function, loop, etc.)
+        self._block_start_re = re.compile(r'\s*(?:def|class|for|while|if|elif)\b')
     
-    def analyze(self, code: str, error_info: ErrorInfo) -> CodeInfo:
+    def analyze(self, code: str, error_info: ErrorInfo, language: Optional[str] = None) -> CodeInfo:
         """Analyze code snippet with error context"""
-        language = self._detect_language(code)
-        error_lines = self._extract_error_lines(code, error_info.line_number)
-        error_block = self._identify_error_block(code, error_info.line_number)
+        if language is None:
+            language = self.detect_language(code)
+        lines = code.split('\n')
+        error_lines = self._extract_error_lines(lines, error_info.line_number)
+        error_block = self._identify_error_block(code, lines, error_info.line_number)
         intent = self._determine_code_intent(error_block, language)
         
         return CodeInfo(
@@ -167,47 +323,53 @@ class StaticCodeAnalysis:
             intent=intent
         )
     
-    def _detect_language(self, code: str) -> str:
+    def detect_language(self, code: str) -> str:
         """Detect programming language from code"""
-        for lang, patterns in self.language_patterns.items():
-            matches = sum(1 for pattern in patterns if re.search(pattern, code, re.MULTILINE))
-            if matches >= 1:  # At least one pattern match
-                return lang
-        return "unknown"
+        # Count the distinct tokens each language matches; search() stops at
+        # the first occurrence, so the code is not scanned to the end
+        hits = Counter()
+        for pattern, languages in self._language_tokens:
+            if pattern.search(code):
+                hits.update(languages)
+        
+        if not hits:
+            return "unknown"
+        
+        # Most hits wins; ties go to the language listed first
+        return max(self._languages, key=lambda lang: hits[lang])
     
-    def _extract_error_lines(self, code: str, line_number: Optional[int]) -> List[str]:
+    def _extract_error_lines(self, lines: List[str], line_number: Optional[int]) -> Tuple[str, ...]:
         """Extract lines around the error location"""
         if not line_number:
-            return [code.split('\n')[0]]  # Return first line if no line number
+            return (lines[0],)  # Return first line if no line number
         
-        lines = code.split('\n')
-        if line_number <= len(lines):
+        line_count = len(lines)
+        if line_number <= line_count:
             # Return the error line and surrounding context
             start = max(0, line_number - 2)
-            end = min(len(lines), line_number + 1)
-            return lines[start:end]
+            end = min(line_count, line_number + 1)
+            return tuple(lines[start:end])
         
-        return []
+        return ()
     
-    def _identify_error_block(self, code: str, line_number: Optional[int]) -> str:
+    def _identify_error_block(self, code: str, lines: List[str], line_number: Optional[int]) -> str:
         """Identify the code block containing the error"""
         if not line_number:
             return code[:200]  # Return first 200 chars if no line number
         
-        lines = code.split('\n')
-        if line_number <= len(lines):
+        line_count = len(lines)
+        if line_number <= line_count:
             # Find the logical block (function, loop, etc.)
             start_line = max(0, line_number - 1)
             
-            # Look backwards for block start
-            for i in range(start_line, -1, -1):
-                line = lines[i].strip()
-                if any(keyword in line for keyword in ['def ', 'class ', 'for ', 'while ', 'if ']):
+            # Look backwards for block start, at most MAX_BLOCK_LOOKBACK lines
+            for i in range(start_line, max(-1, start_line - self.MAX_BLOCK_LOOKBACK), -1):
+                if self._block_start_re.match(lines[i]):
                     start_line = i
                     break
             
             # Look forwards for block end
-            end_line = min(len(lines), line_number + 5)
+            end_line = min(line_count, line_number + 5)
             
             return '\n'.join(lines[start_line:end_line])
         
@@ -215,266 +377,309 @@ class StaticCodeAnalysis:
     
     def _determine_code_intent(self, code_block: str, language: str) -> str:
         """Determine the intent of the code block"""
-        code_lower = code_block.lower().strip()
+        code_lower = code_block.lower()
+        keywords = set(self._intent_re.findall(code_lower))
         
-        if 'def ' in code_lower or 'function ' in code_lower:
+        if 'def' in keywords or 'function' in keywords:
             return "function definition"
-        elif any(keyword in code_lower for keyword in ['for ', 'while ']):
+        elif 'for' in keywords or 'while' in keywords:
             return "loop"
-        elif 'class ' in code_lower:
+        elif 'class' in keywords:
             return "class definition"
-        elif any(keyword in code_lower for keyword in ['if ', 'elif ', 'else']):
+        elif 'if' in keywords or 'elif' in keywords or 'else' in keywords:
             return "conditional statement"
         elif '=' in code_lower and not '==' in code_lower:
             return "variable assignment"
-        elif any(keyword in code_lower for keyword in ['import ', '#include']):
+        elif 'import' in keywords or '#include' in keywords:
             return "import/include statement"
         else:
             return "code execution"
 
-class RuleBasedSystem:
-    """Rule-based system for common error patterns"""
+# Rule table is built once at import and shared by every RuleBasedSystem
+_RULES: Dict[Tuple[str, str], Dict] = {
+    # Python rules
+    ('IndexError', 'python'): {
+        'explanation': "An IndexError occurs when trying to access a list, tuple, or string index that doesn't exist.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will halt program execution immediately and may cause data loss if not handled.",
+        'fixes': [
+            {
+                'title': 'Bounds Checking',
+                'code': 'if index < len(my_list):\n    value = my_list[index]',
+                'explanation': 'Always check if the index is within valid range before accessing.'
+            },
+            {
+                'title': 'Use Enumerate',
+                'code': 'for i, item in enumerate(my_list):\n    # Process item',
+                'explanation': 'Use enumerate() to safely iterate with indices.'
+            }
+        ],
+        'best_practices': [
+            "Always validate array/list bounds before accessing elements",
+            "Use len() function to check collection size",
+            "Consider using try/except blocks for error handling"
+        ]
+    },
     
-    def __init__(self):
-        self.rules = {
-            # Python rules
-            ('IndexError', 'python'): {
-                'explanation': "An IndexError occurs when trying to access a list, tuple, or string index that doesn't exist.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will halt program execution immediately and may cause data loss if not handled.",
-                'fixes': [
-                    {
-                        'title': 'Bounds Checking',
-                        'code': 'if index < len(my_list):\n    value = my_list[index]',
-                        'explanation': 'Always check if the index is within valid range before accessing.'
-                    },
-                    {
-                        'title': 'Use Enumerate',
-                        'code': 'for i, item in enumerate(my_list):\n    # Process item',
-                        'explanation': 'Use enumerate() to safely iterate with indices.'
-                    }
-                ],
-                'best_practices': [
-                    "Always validate array/list bounds before accessing elements",
-                    "Use len() function to check collection size",
-                    "Consider using try/except blocks for error handling"
-                ]
+    ('NameError', 'python'): {
+        'explanation': "A NameError occurs when trying to use a variable or function name that hasn't been defined.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This prevents the code from running and indicates a missing variable definition.",
+        'fixes': [
+            {
+                'title': 'Define Variable',
+                'code': 'variable_name = initial_value',
+                'explanation': 'Ensure the variable is defined before using it.'
             },
-            
-            ('NameError', 'python'): {
-                'explanation': "A NameError occurs when trying to use a variable or function name that hasn't been defined.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This prevents the code from running and indicates a missing variable definition.",
-                'fixes': [
-                    {
-                        'title': 'Define Variable',
-                        'code': 'variable_name = initial_value',
-                        'explanation': 'Ensure the variable is defined before using it.'
-                    },
-                    {
-                        'title': 'Check Imports',
-                        'code': 'from module import function_name',
-                        'explanation': 'Make sure required functions are properly imported.'
-                    }
-                ],
-                'best_practices': [
-                    "Define all variables before using them",
-                    "Check spelling of variable and function names",
-                    "Ensure proper import statements"
-                ]
+            {
+                'title': 'Check Imports',
+                'code': 'from module import function_name',
+                'explanation': 'Make sure required functions are properly imported.'
+            }
+        ],
+        'best_practices': [
+            "Define all variables before using them",
+            "Check spelling of variable and function names",
+            "Ensure proper import statements"
+        ]
+    },
+    
+    ('SyntaxError', 'python'): {
+        'explanation': "A SyntaxError occurs when Python cannot parse the code due to incorrect syntax.",
+        'severity': ErrorSeverity.CRITICAL,
+        'impact': "The code cannot run at all until the syntax is fixed.",
+        'fixes': [
+            {
+                'title': 'Check Indentation',
+                'code': 'if condition:\n    statement  # Proper indentation',
+                'explanation': 'Ensure consistent indentation (4 spaces recommended).'
             },
-            
-            ('SyntaxError', 'python'): {
-                'explanation': "A SyntaxError occurs when Python cannot parse the code due to incorrect syntax.",
-                'severity': ErrorSeverity.CRITICAL,
-                'impact': "The code cannot run at all until the syntax is fixed.",
-                'fixes': [
-                    {
-                        'title': 'Check Indentation',
-                        'code': 'if condition:\n    statement  # Proper indentation',
-                        'explanation': 'Ensure consistent indentation (4 spaces recommended).'
-                    },
-                    {
-                        'title': 'Check Parentheses',
-                        'code': 'result = function(arg1, arg2)',
-                        'explanation': 'Make sure all parentheses, brackets, and braces are properly closed.'
-                    }
-                ],
-                'best_practices': [
-                    "Use consistent indentation (4 spaces)",
-                    "Match all opening and closing brackets/parentheses",
-                    "Use a code editor with syntax highlighting"
-                ]
+            {
+                'title': 'Check Parentheses',
+                'code': 'result = function(arg1, arg2)',
+                'explanation': 'Make sure all parentheses, brackets, and braces are properly closed.'
+            }
+        ],
+        'best_practices': [
+            "Use consistent indentation (4 spaces)",
+            "Match all opening and closing brackets/parentheses",
+            "Use a code editor with syntax highlighting"
+        ]
+    },
+    
+    ('ZeroDivisionError', 'python'): {
+        'explanation': "A ZeroDivisionError occurs when attempting to divide by zero.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will halt program execution and indicates improper input validation.",
+        'fixes': [
+            {
+                'title': 'Check Divisor',
+                'code': 'if divisor != 0:\n    result = numerator / divisor\nelse:\n    result = float(\'inf\')',
+                'explanation': 'Always check if the divisor is zero before performing division.'
             },
-            
-            ('ZeroDivisionError', 'python'): {
-                'explanation': "A ZeroDivisionError occurs when attempting to divide by zero.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will halt program execution and indicates improper input validation.",
-                'fixes': [
-                    {
-                        'title': 'Check Divisor',
-                        'code': 'if divisor != 0:\n    result = numerator / divisor\nelse:\n    result = float(\'inf\')',
-                        'explanation': 'Always check if the divisor is zero before performing division.'
-                    },
-                    {
-                        'title': 'Use Try-Except',
-                        'code': 'try:\n    result = numerator / divisor\nexcept ZeroDivisionError:\n    result = None  # or handle appropriately',
-                        'explanation': 'Handle division by zero with exception handling.'
-                    }
-                ],
-                'best_practices': [
-                    "Validate inputs before mathematical operations",
-                    "Consider what should happen when division by zero occurs",
-                    "Use appropriate default values or error handling"
-                ]
+            {
+                'title': 'Use Try-Except',
+                'code': 'try:\n    result = numerator / divisor\nexcept ZeroDivisionError:\n    result = None  # or handle appropriately',
+                'explanation': 'Handle division by zero with exception handling.'
+            }
+        ],
+        'best_practices': [
+            "Validate inputs before mathematical operations",
+            "Consider what should happen when division by zero occurs",
+            "Use appropriate default values or error handling"
+        ]
+    },
+    
+    ('AttributeError', 'python'): {
+        'explanation': "An AttributeError occurs when trying to access an attribute or method that doesn't exist on an object.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will crash the program and often indicates None values or incorrect object types.",
+        'fixes': [
+            {
+                'title': 'None Check',
+                'code': 'if obj is not None:\n    result = obj.attribute\nelse:\n    result = default_value',
+                'explanation': 'Check if the object is None before accessing its attributes.'
             },
-            
-            ('AttributeError', 'python'): {
-                'explanation': "An AttributeError occurs when trying to access an attribute or method that doesn't exist on an object.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will crash the program and often indicates None values or incorrect object types.",
-                'fixes': [
-                    {
-                        'title': 'None Check',
-                        'code': 'if obj is not None:\n    result = obj.attribute\nelse:\n    result = default_value',
-                        'explanation': 'Check if the object is None before accessing its attributes.'
-                    },
-                    {
-                        'title': 'Hasattr Check',
-                        'code': 'if hasattr(obj, \'attribute\'):\n    result = obj.attribute\nelse:\n    result = default_value',
-                        'explanation': 'Use hasattr() to check if an attribute exists before accessing it.'
-                    }
-                ],
-                'best_practices': [
-                    "Always validate object state before accessing attributes",
-                    "Initialize objects properly in constructors",
-                    "Use getattr() with default values for optional attributes"
-                ]
+            {
+                'title': 'Hasattr Check',
+                'code': 'if hasattr(obj, \'attribute\'):\n    result = obj.attribute\nelse:\n    result = default_value',
+                'explanation': 'Use hasattr() to check if an attribute exists before accessing it.'
+            }
+        ],
+        'best_practices': [
+            "Always validate object state before accessing attributes",
+            "Initialize objects properly in constructors",
+            "Use getattr() with default values for optional attributes"
+        ]
+    },
+    
+    ('KeyError', 'python'): {
+        'explanation': "A KeyError occurs when trying to access a dictionary key that doesn't exist.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will halt execution and indicates missing data validation or incorrect key usage.",
+        'fixes': [
+            {
+                'title': 'Key Check',
+                'code': 'if key in dictionary:\n    value = dictionary[key]\nelse:\n    value = default_value',
+                'explanation': 'Check if the key exists in the dictionary before accessing it.'
             },
-            
-            ('KeyError', 'python'): {
-                'explanation': "A KeyError occurs when trying to access a dictionary key that doesn't exist.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will halt execution and indicates missing data validation or incorrect key usage.",
-                'fixes': [
-                    {
-                        'title': 'Key Check',
-                        'code': 'if key in dictionary:\n    value = dictionary[key]\nelse:\n    value = default_value',
-                        'explanation': 'Check if the key exists in the dictionary before accessing it.'
-                    },
-                    {
-                        'title': 'Use Get Method',
-                        'code': 'value = dictionary.get(key, default_value)',
-                        'explanation': 'Use the get() method with a default value to safely access dictionary keys.'
-                    }
-                ],
-                'best_practices': [
-                    "Validate dictionary keys before access",
-                    "Use dict.get() method for safe key access",
-                    "Handle missing keys gracefully with appropriate defaults"
-                ]
+            {
+                'title': 'Use Get Method',
+                'code': 'value = dictionary.get(key, default_value)',
+                'explanation': 'Use the get() method with a default value to safely access dictionary keys.'
+            }
+        ],
+        'best_practices': [
+            "Validate dictionary keys before access",
+            "Use dict.get() method for safe key access",
+            "Handle missing keys gracefully with appropriate defaults"
+        ]
+    },
+    
+    ('RecursionError', 'python'): {
+        'explanation': "A RecursionError occurs when the maximum recursion depth is exceeded, usually due to infinite recursion.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will crash the program and may consume excessive memory before failing.",
+        'fixes': [
+            {
+                'title': 'Add Base Case',
+                'code': 'def recursive_func(n):\n    if n <= 0:  # Base case\n        return 0\n    return n + recursive_func(n-1)',
+                'explanation': 'Ensure your recursive function has a proper base case to terminate recursion.'
             },
-            
-            ('RecursionError', 'python'): {
-                'explanation': "A RecursionError occurs when the maximum recursion depth is exceeded, usually due to infinite recursion.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will crash the program and may consume excessive memory before failing.",
-                'fixes': [
-                    {
-                        'title': 'Add Base Case',
-                        'code': 'def recursive_func(n):\n    if n <= 0:  # Base case\n        return 0\n    return n + recursive_func(n-1)',
-                        'explanation': 'Ensure your recursive function has a proper base case to terminate recursion.'
-                    },
-                    {
-                        'title': 'Convert to Iterative',
-                        'code': 'def iterative_func(n):\n    result = 0\n    for i in range(1, n+1):\n        result += i\n    return result',
-                        'explanation': 'Consider converting recursive algorithms to iterative ones for large inputs.'
-                    }
-                ],
-                'best_practices': [
-                    "Always define clear base cases for recursive functions",
-                    "Consider iterative solutions for large datasets",
-                    "Use sys.setrecursionlimit() carefully if needed"
-                ]
+            {
+                'title': 'Convert to Iterative',
+                'code': 'def iterative_func(n):\n    result = 0\n    for i in range(1, n+1):\n        result += i\n    return result',
+                'explanation': 'Consider converting recursive algorithms to iterative ones for large inputs.'
+            }
+        ],
+        'best_practices': [
+            "Always define clear base cases for recursive functions",
+            "Consider iterative solutions for large datasets",
+            "Use sys.setrecursionlimit() carefully if needed"
+        ]
+    },
+    
+    ('RuntimeError', 'python'): {
+        'explanation': "A RuntimeError occurred, often related to async operations or system-level issues.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This indicates improper usage of runtime features like async/await or system resources.",
+        'fixes': [
+            {
+                'title': 'Proper Async Usage',
+                'code': 'import asyncio\n\nasync def main():\n    result = await async_function()\n    return result\n\nasyncio.run(main())',
+                'explanation': 'Use asyncio.run() or await keyword properly for coroutines.'
             },
-            
-            ('RuntimeError', 'python'): {
-                'explanation': "A RuntimeError occurred, often related to async operations or system-level issues.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This indicates improper usage of runtime features like async/await or system resources.",
-                'fixes': [
-                    {
-                        'title': 'Proper Async Usage',
-                        'code': 'import asyncio\n\nasync def main():\n    result = await async_function()\n    return result\n\nasyncio.run(main())',
-                        'explanation': 'Use asyncio.run() or await keyword properly for coroutines.'
-                    },
-                    {
-                        'title': 'Exception Handling',
-                        'code': 'try:\n    # Problematic operation\n    pass\nexcept RuntimeError as e:\n    print(f"Runtime error: {e}")',
-                        'explanation': 'Handle runtime errors with specific exception catching.'
-                    }
-                ],
-                'best_practices': [
-                    "Use proper async/await patterns for coroutines",
-                    "Handle system-level errors appropriately",
-                    "Validate runtime conditions before operations"
-                ]
+            {
+                'title': 'Exception Handling',
+                'code': 'try:\n    # Problematic operation\n    pass\nexcept RuntimeError as e:\n    print(f"Runtime error: {e}")',
+                'explanation': 'Handle runtime errors with specific exception catching.'
+            }
+        ],
+        'best_practices': [
+            "Use proper async/await patterns for coroutines",
+            "Handle system-level errors appropriately",
+            "Validate runtime conditions before operations"
+        ]
+    },
+    
+    ('JSONDecodeError', 'python'): {
+        'explanation': "A JSONDecodeError occurs when trying to parse invalid JSON data.",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will halt execution and indicates malformed or invalid JSON input.",
+        'fixes': [
+            {
+                'title': 'Validate JSON',
+                'code': 'import json\n\ntry:\n    data = json.loads(json_string)\nexcept json.JSONDecodeError as e:\n    print(f"Invalid JSON: {e}")\n    data = {}',
+                'explanation': 'Always wrap JSON parsing in try-except blocks to handle invalid data.'
             },
-            
-            ('JSONDecodeError', 'python'): {
-                'explanation': "A JSONDecodeError occurs when trying to parse invalid JSON data.",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will halt execution and indicates malformed or invalid JSON input.",
-                'fixes': [
-                    {
-                        'title': 'Validate JSON',
-                        'code': 'import json\n\ntry:\n    data = json.loads(json_string)\nexcept json.JSONDecodeError as e:\n    print(f"Invalid JSON: {e}")\n    data = {}',
-                        'explanation': 'Always wrap JSON parsing in try-except blocks to handle invalid data.'
-                    },
-                    {
-                        'title': 'Pre-validate Format',
-                        'code': 'if json_string.strip().startswith((\'{\', \'[\')):\n    data = json.loads(json_string)\nelse:\n    raise ValueError("Not valid JSON format")',
-                        'explanation': 'Perform basic format validation before attempting to parse JSON.'
-                    }
-                ],
-                'best_practices': [
-                    "Always validate JSON input before parsing",
-                    "Use proper exception handling for JSON operations",
-                    "Provide meaningful error messages for invalid JSON"
-                ]
+            {
+                'title': 'Pre-validate Format',
+                'code': 'if json_string.strip().startswith((\'{\', \'[\')):\n    data = json.loads(json_string)\nelse:\n    raise ValueError("Not valid JSON format")',
+                'explanation': 'Perform basic format validation before attempting to parse JSON.'
+            }
+        ],
+        'best_practices': [
+            "Always validate JSON input before parsing",
+            "Use proper exception handling for JSON operations",
+            "Provide meaningful error messages for invalid JSON"
+        ]
+    },
+    
+    # Java rules
+    ('NullPointerException', 'java'): {
+        'explanation': "A NullPointerException occurs when trying to use a reference that points to no location in memory (null).",
+        'severity': ErrorSeverity.HIGH,
+        'impact': "This will crash the program and may indicate improper object initialization.",
+        'fixes': [
+            {
+                'title': 'Null Check',
+                'code': 'if (object != null) {\n    object.method();\n}',
+                'explanation': 'Always check for null before using an object reference.'
             },
-            
-            # Java rules
-            ('NullPointerException', 'java'): {
-                'explanation': "A NullPointerException occurs when trying to use a reference that points to no location in memory (null).",
-                'severity': ErrorSeverity.HIGH,
-                'impact': "This will crash the program and may indicate improper object initialization.",
-                'fixes': [
-                    {
-                        'title': 'Null Check',
-                        'code': 'if (object != null) {\n    object.method();\n}',
-                        'explanation': 'Always check for null before using an object reference.'
-                    },
-                    {
-                        'title': 'Initialize Object',
-                        'code': 'MyObject obj = new MyObject();',
-                        'explanation': 'Ensure objects are properly initialized before use.'
-                    }
-                ],
-                'best_practices': [
-                    "Always initialize objects before using them",
-                    "Use null checks when objects might be null",
-                    "Consider using Optional<T> in Java 8+"
-                ]
+            {
+                'title': 'Initialize Object',
+                'code': 'MyObject obj = new MyObject();',
+                'explanation': 'Ensure objects are properly initialized before use.'
             }
-        }
+        ],
+        'best_practices': [
+            "Always initialize objects before using them",
+            "Use null checks when objects might be null",
+            "Consider using Optional<T> in Java 8+"
+        ]
+    }
+}
+
+# Freeze the fixes and best practices so results handed out from the
+# shared table cannot be mutated by callers
+for _rule in _RULES.values():
+    _rule['fixes'] = tuple(MappingProxyType(fix) for fix in _rule['fixes'])
+    _rule['best_practices'] = tuple(_rule['best_practices'])
+del _rule
+
+class RuleBasedSystem:
+    """Rule-based system for common error patterns"""
     
-    def get_recommendation(self, error_info: ErrorInfo, code_info: CodeInfo) -> Optional[Dict]:
+    def __init__(self):
+        self.rules = _RULES
+    
+    def get_recommendation(self, error_info: ErrorInfo, language: str) -> Optional[Dict]:
         """Get recommendation based on error type and language"""
-        key = (error_info.error_type, code_info.language)
+        key = (error_info.error_type, language)
         return self.rules.get(key)
 
+# Severity implied by each error classification
+_SEVERITY_BY_CLASSIFICATION = {
+    ErrorClassification.SYNTAX: ErrorSeverity.CRITICAL,
+    ErrorClassification.RUNTIME: ErrorSeverity.HIGH,
+    ErrorClassification.LOGICAL: ErrorSeverity.MEDIUM,
+    ErrorClassification.SEMANTIC: ErrorSeverity.MEDIUM,
+    ErrorClassification.UNKNOWN: ErrorSeverity.MEDIUM
+}
+
+# (impact, priority reasoning) for each severity
+_SEVERITY_INFO: Dict[ErrorSeverity, Tuple[str, str]] = {
+    ErrorSeverity.CRITICAL: (
+        "This will prevent the program from running entirely and must be fixed immediately.",
+        "This error prevents code execution entirely and should be addressed immediately to restore functionality."
+    ),
+    ErrorSeverity.HIGH: (
+        "This will cause the program to crash and may result in data loss or unexpected behavior.",
+        "This error causes program crashes and may lead to data loss, making it a high priority for resolution."
+    ),
+    ErrorSeverity.MEDIUM: (
+        "This may cause incorrect results or unexpected behavior in certain conditions.",
+        "This error may cause incorrect behavior under certain conditions and should be addressed in the next development cycle."
+    ),
+    ErrorSeverity.LOW: (
+        "This is a minor issue that may affect code quality or performance.",
+        "This is a code quality issue that can be addressed during routine maintenance or refactoring."
+    )
+}
+
+# Display string for each severity, looked up once per report
+_SEV_VALUE: Dict[ErrorSeverity, str] = {severity: severity.value for severity in ErrorSeverity}
+
 class LanguageModelAnalyzer:
     """LM-powered analyzer for complex cases"""
     
@@ -482,15 +687,7 @@ class LanguageModelAnalyzer:
         """Generate explanation and fixes for complex/unknown errors"""
         
         # Determine severity based on error classification
-        severity_map = {
-            ErrorClassification.SYNTAX: ErrorSeverity.CRITICAL,
-            ErrorClassification.RUNTIME: ErrorSeverity.HIGH,
-            ErrorClassification.LOGICAL: ErrorSeverity.MEDIUM,
-            ErrorClassification.SEMANTIC: ErrorSeverity.MEDIUM,
-            ErrorClassification.UNKNOWN: ErrorSeverity.MEDIUM
-        }
-        
-        severity = severity_map.get(error_info.classification, ErrorSeverity.MEDIUM)
+        severity = _SEVERITY_BY_CLASSIFICATION.get(error_info.classification, ErrorSeverity.MEDIUM)
         
         # Generate contextual explanation
         explanation = self._generate_explanation(error_info, code_info)
@@ -502,8 +699,8 @@ class LanguageModelAnalyzer:
             'explanation': explanation,
             'severity': severity,
             'impact': impact,
-            'fixes': fixes,
-            'best_practices': best_practices
+            'fixes': tuple(MappingProxyType(fix) for fix in fixes),
+            'best_practices': tuple(best_practices)
         }
     
     def _generate_explanation(self, error_info: ErrorInfo, code_info: CodeInfo) -> str:
@@ -533,14 +730,7 @@ class LanguageModelAnalyzer:
     
     def _assess_impact(self, error_info: ErrorInfo, severity: ErrorSeverity) -> str:
         """Assess the impact of the error"""
-        impact_map = {
-            ErrorSeverity.CRITICAL: "This will prevent the program from running entirely and must be fixed immediately.",
-            ErrorSeverity.HIGH: "This will cause the program to crash and may result in data loss or unexpected behavior.",
-            ErrorSeverity.MEDIUM: "This may cause incorrect results or unexpected behavior in certain conditions.",
-            ErrorSeverity.LOW: "This is a minor issue that may affect code quality or performance."
-        }
-        
-        return impact_map.get(severity, "Impact assessment unavailable.")
+        return _SEVERITY_INFO[severity][0]
     
     def _generate_fixes(self, error_info: ErrorInfo, code_info: CodeInfo) -> List[Dict[str, str]]:
         """Generate potential fixes based on error context"""
@@ -598,28 +788,168 @@ class LanguageModelAnalyzer:
         
         return practices
 
+# Line numbers in a log; the last one is the innermost traceback frame
+_LOG_LINE_RE = re.compile(r'\bline (\d+)')
+
+def _fix_zero_division(code: str, match) -> Optional[str]:
+    """Guard the division on the line the traceback reports against a zero divisor"""
+    reported_lines = _LOG_LINE_RE.findall(match.string)
+    if not reported_lines:
+        return None
+    line_number = int(reported_lines[-1])
+
+    tree = ast.parse(code)
+    divisions = [
+        node for node in ast.walk(tree)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div)
+        and node.lineno <= line_number <= node.end_lineno
+    ]
+    # Only a single '/' by a name or attribute, which can be re-evaluated in
+    # the guard; '//' and '%' have no sensible fallback value
+    if len(divisions) != 1 or not isinstance(divisions[0].right, (ast.Name, ast.Attribute)):
+        return None
+    division = divisions[0]
+
+    guarded = (
+        f"{ast.get_source_segment(code, division)} "
+        f"if {ast.get_source_segment(code, division.right)} != 0 else float('inf')"
+    )
+    # A conditional expression binds loosest, so parenthesize it unless it
+    # stands alone as a statement value or call argument
+    parent = next(node for node in ast.walk(tree) if division in ast.iter_child_nodes(node))
+    if not (isinstance(parent, (ast.Assign, ast.AnnAssign, ast.Return, ast.Expr, ast.keyword))
+            or isinstance(parent, ast.Call) and division in parent.args):
+        guarded = f"({guarded})"
+    return _splice_source(code, [(division, guarded)])
+
+def _splice_source(code: str, edits: List[Tuple[ast.AST, str]]) -> str:
+    """Replace the source text of each node, keeping the rest of the code as written"""
+    # AST offsets are in UTF-8 bytes, counted from the start of each line
+    source = code.encode()
+    line_starts = [0]
+    for line in source.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+
+    # Splice from the end so earlier offsets stay valid
+    for node, text in sorted(edits, key=lambda edit: (edit[0].lineno, edit[0].col_offset), reverse=True):
+        start = line_starts[node.lineno - 1] + node.col_offset
+        end = line_starts[node.end_lineno - 1] + node.end_col_offset
+        source = source[:start] + text.encode() + source[end:]
+    return source.decode()
+
+def _fix_name_typo(code: str, match) -> Optional[str]:
+    """Replace an undefined name with the closest name the code defines, if one is close"""
+    name = match.group(1)
+    tree = ast.parse(code)
+
+    # Only names bound in the code itself and visible everywhere the name is
+    # used: matching builtins turns typos of user names into wrong calls
+    # ('lst' -> 'list'), and a name local to another function would still
+    # be undefined at the use
+    defined = None
+    scopes = [(symtable.symtable(code, "<string>", "exec"), ())]
+    while scopes:
+        scope, enclosing = scopes.pop()
+        scopes.extend((child, (scope,) + enclosing) for child in scope.get_children())
+        try:
+            if not scope.lookup(name).is_referenced():
+                continue
+        except KeyError:
+            continue
+
+        # Class bodies are not visible from the functions nested in them
+        visible = {symbol.get_name() for symbol in scope.get_symbols() if symbol.is_local()}
+        for outer in enclosing:
+            if outer.get_type() != "class":
+                visible.update(symbol.get_name() for symbol in outer.get_symbols() if symbol.is_local())
+        defined = visible if defined is None else defined & visible
+    if not defined:
+        return None
+    defined.discard(name)
+
+    # A high cutoff so only likely typos are patched ('totl' -> 'total')
+    candidates = difflib.get_close_matches(name, defined, n=1, cutoff=0.8)
+    if not candidates:
+        return None
+
+    return _splice_source(code, [
+        (node, candidates[0]) for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and node.id == name
+    ])
+
+# Python errors that can be patched deterministically, without calling Gemini.
+# A fixer returns None when it can't produce a confident patch.
+_FAST_FIXERS = [
+    (re.compile(r"(?m)^ZeroDivisionError\b"), _fix_zero_division),
+    (re.compile(r"(?m)^NameError: name '([^']+)' is not defined"), _fix_name_typo),
+]
+
+def _fast_fix(code: Optional[str], log: Optional[str]) -> Optional[str]:
+    """Return corrected code for a trivially diagnosable error, or None"""
+    if not code or not log:
+        return None
+    for pattern, fixer in _FAST_FIXERS:
+        match = pattern.search(log)
+        if match:
+            try:
+                fixed = fixer(code, match)
+                # A splice can still break the code (e.g. quotes inside an
+                # f-string), so only a patch that parses skips Gemini
+                if fixed is not None:
+                    ast.parse(fixed)
+                return fixed
+            except (SyntaxError, ValueError):
+                return None  # Not parseable Python; leave it to Gemini
+    return None
+
 class CodeErrorRecommendationEngine:
     """Main recommendation engine that combines rule-based and LM approaches"""
     
+    _BANNER: ClassVar[str] = "=" * 60
+    _REPORT_TEMPLATE: ClassVar[str] = (
+        _BANNER + "\n"
+        "CODE ERROR ANALYSIS REPORT\n"
+        + _BANNER + "\n"
+        "\n🔍 EXPLANATION:\n"
+        "{explanation}\n"
+        "\n⚠️  SEVERITY: {severity}\n"
+        "📊 IMPACT: {impact}\n"
+        "\n🎯 PRIORITY REASONING:\n"
+        "{priority_reasoning}\n"
+        "{fixes}"
+        "{practices}"
+        "\n" + _BANNER
+    )
+    
     def __init__(self):
         self.error_analyzer = ErrorLogAnalyzer()
         self.code_analyzer = StaticCodeAnalysis()
         self.rule_system = RuleBasedSystem()
         self.lm_analyzer = LanguageModelAnalyzer()
+        
+        # Memoize analysis and the formatted report per (code, error_log);
+        # results are frozen so cache hits can be shared between callers
+        self._analyze_error_cached = lru_cache(maxsize=256)(self._analyze_error)
+        self._report_cached = lru_cache(maxsize=256)(self._report)
     
     def analyze_error(self, code: str, error_log: str) -> RecommendationResult:
         """Main analysis function that processes code and error log"""
+        return self._analyze_error_cached(code, error_log)
+    
+    def _analyze_error(self, code: str, error_log: str) -> RecommendationResult:
+        """Run the full analysis pipeline, bypassing the cache"""
+        
+        # Step 1: Detect language once; the rule lookup and code analysis share it
+        language = self.code_analyzer.detect_language(code)
         
-        # Step 1: Analyze error log
+        # Step 2: Analyze error log
         error_info = self.error_analyzer.analyze(error_log)
-        print("error info : ", error_info)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("error info: %r", error_info)
         
-        # Step 2: Analyze code
-        code_info = self.code_analyzer.analyze(code, error_info)
-        print("code info: ", code_info)
-
-        # Step 3: Try rule-based system first
-        rule_recommendation = self.rule_system.get_recommendation(error_info, code_info)
+        # Step 3: Try rule-based system first; rules only need the error type
+        # and language, so the code block analysis is skipped on a hit
+        rule_recommendation = self.rule_system.get_recommendation(error_info, language)
         
         if rule_recommendation:
             # Use rule-based recommendation
@@ -632,6 +962,11 @@ class CodeErrorRecommendationEngine:
                 priority_reasoning=self._generate_priority_reasoning(rule_recommendation['severity'])
             )
         else:
+            # Step 4: Analyze code for the LM fallback
+            code_info = self.code_analyzer.analyze(code, error_info, language=language)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("code info: %r", code_info)
+            
             # Fall back to LM analysis
             lm_recommendation = self.lm_analyzer.analyze_complex_error(error_info, code_info)
             
@@ -646,134 +981,242 @@ class CodeErrorRecommendationEngine:
     
     def _generate_priority_reasoning(self, severity: ErrorSeverity) -> str:
         """Generate reasoning for error prioritization"""
-        reasoning_map = {
-            ErrorSeverity.CRITICAL: "This error prevents code execution entirely and should be addressed immediately to restore functionality.",
-            ErrorSeverity.HIGH: "This error causes program crashes and may lead to data loss, making it a high priority for resolution.",
-            ErrorSeverity.MEDIUM: "This error may cause incorrect behavior under certain conditions and should be addressed in the next development cycle.",
-            ErrorSeverity.LOW: "This is a code quality issue that can be addressed during routine maintenance or refactoring."
-        }
-        
-        return reasoning_map.get(severity, "Priority assessment unavailable.")
+        return _SEVERITY_INFO[severity][1]
     
     def format_output(self, result: RecommendationResult) -> str:
         """Format the recommendation result for display"""
-        output = []
-        output.append("=" * 60)
-        output.append("CODE ERROR ANALYSIS REPORT")
-        output.append("=" * 60)
-        
-        output.append(f"\n🔍 EXPLANATION:")
-        output.append(f"{result.explanation}")
-        
-        output.append(f"\n⚠️  SEVERITY: {result.severity.value}")
-        output.append(f"📊 IMPACT: {result.impact}")
-        
-        output.append(f"\n🎯 PRIORITY REASONING:")
-        output.append(f"{result.priority_reasoning}")
-        
-        output.append(f"\n🔧 PROPOSED FIXES:")
-        for i, fix in enumerate(result.proposed_fixes, 1):
-            output.append(f"\n{i}. {fix['title']}")
-            output.append(f"   Code: {fix['code']}")
-            output.append(f"   Explanation: {fix['explanation']}")
-        
-        output.append(f"\n💡 BEST PRACTICES:")
-        for practice in result.best_practices:
-            output.append(f"• {practice}")
+        # Sections with nothing to list are left out of the report
+        fixes = ""
+        if result.proposed_fixes:
+            fixes = "\n🔧 PROPOSED FIXES:" + "".join(
+                f"\n\n{i}. {fix['title']}"
+                f"\n   Code: {fix['code']}"
+                f"\n   Explanation: {fix['explanation']}"
+                for i, fix in enumerate(result.proposed_fixes, 1)
+            ) + "\n"
+        practices = ""
+        if result.best_practices:
+            practices = "\n💡 BEST PRACTICES:" + "".join(
+                f"\n• {practice}" for practice in result.best_practices
+            ) + "\n"
         
-        output.append("\n" + "=" * 60)
-        
-        return "\n".join(output)
+        return self._REPORT_TEMPLATE.format(
+            explanation=result.explanation,
+            severity=_SEV_VALUE[result.severity],
+            impact=result.impact,
+            priority_reasoning=result.priority_reasoning,
+            fixes=fixes,
+            practices=practices
+        )
+
+    def _report(self, code: str, log: str) -> Tuple[RecommendationResult, str]:
+        """Analyze one job and format its report, so retries skip both steps"""
+        result = self.analyze_error(code, log)
+        return result, self.format_output(result)
 
     def debugg(self, code:str=None, log:str=None) -> dict[str]:
 
-        result = self.analyze_error(code, log)
-        report = self.format_output(result)
-                
-        custom_prompt = f"""Based on the error analysis report, generate only the corrected code without any comments or explanations. Provide the complete working code and nothing else.
+        cache_key = _response_cache_key(code, log)
+        cached = _read_cached_response(cache_key)
+        if cached is not None:
+            return cached
 
-        Code: 
-        {code}
-        Code Error log:
-        {log}
+        result, report = self._report_cached(code, log)
 
-        Report:
-        {report}
-        """
+        corrected_code = _fast_fix(code, log)
+        if corrected_code is not None:
+            return {"report": report, "corrected_code": corrected_code}
 
-        client = genai.Client(api_key="YOUR_API_KEY")
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=custom_prompt
+        response = _get_genai_client().models.generate_content(
+            model=GEMINI_MODEL,
+            contents=self._build_correction_prompt(code, log, result),
+            config=_CORRECTION_CONFIG
         )
 
-        return {"report": report, "corrected_code": response.text}
+        debug_result = {"report": report, "corrected_code": json.loads(response.text)["corrected_code"]}
+        _write_cached_response(cache_key, debug_result)
+        return debug_result
 
+    def debugg_stream(self, code:str=None, log:str=None) -> Iterator[str]:
+        """Like debugg, but yield the corrected code in chunks as Gemini produces them"""
+        cached = _read_cached_response(_response_cache_key(code, log))
+        if cached is not None:
+            yield cached["corrected_code"]
+            return
 
+        corrected_code = _fast_fix(code, log)
+        if corrected_code is not None:
+            yield corrected_code
+            return
 
-if __name__ == "__main__":
-    engine = CodeErrorRecommendationEngine()
-    
-    # Example 1: Python IndexError
-    print("EXAMPLE 1: Python IndexError")
-    print("-" * 40)
-    
-    code = """
-def divide(a, b):
-    return a / b
+        # Streamed text is free-form (it may arrive in markdown fences), so
+        # unlike the structured replies of debugg it is not cached
+        for chunk in _get_genai_client().models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=self._build_correction_prompt(code, log, self.analyze_error(code, log))
+        ):
+            if chunk.text:
+                yield chunk.text
 
-result = divide(10, 0)
-"""
-    
-    log = "ZeroDivisionError: division by zero"
+    async def debugg_async(self, code:str=None, log:str=None) -> dict[str]:
+        """Async variant of debugg so several jobs can wait on Gemini concurrently"""
+        import asyncio
+
+        # SQLite calls block, so they run in a worker thread
+        cache_key = _response_cache_key(code, log)
+        cached = await asyncio.to_thread(_read_cached_response, cache_key)
+        if cached is not None:
+            return cached
+
+        result, report = self._report_cached(code, log)
+
+        corrected_code = _fast_fix(code, log)
+        if corrected_code is not None:
+            return {"report": report, "corrected_code": corrected_code}
 
-    print(
-        f"{'-'*30}"
-        f"\n=> Code : \n "
-        f"{code}"
-        f"\n=> Log : \n"
-        f"{log}\n"
+        response = await _get_genai_client().aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=self._build_correction_prompt(code, log, result),
+            config=_CORRECTION_CONFIG
         )
 
+        debug_result = {"report": report, "corrected_code": json.loads(response.text)["corrected_code"]}
+        await asyncio.to_thread(_write_cached_response, cache_key, debug_result)
+        return debug_result
 
-    result = engine.debugg(code, log)
-    print(
-        f"\n=> report : \n"
-        f"{result['report']}"
-        f"\n=> Corrected code: \n"
-        f"{result['corrected_code']}"
+    async def debugg_all(self, jobs: List[Tuple[str, str]], max_concurrency: int = 8) -> List[dict]:
+        """Debug several (code, log) jobs concurrently, in input order"""
+        # Imported here, like the Gemini SDK, to keep importing the engine cheap
+        import asyncio
+
+        # Concurrency past the provider's rate limit only queues requests
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(code: str, log: str) -> dict:
+            async with semaphore:
+                return await self.debugg_async(code, log)
+
+        return await asyncio.gather(*(run(code, log) for code, log in jobs))
+
+    def debugg_batch(self, jobs: List[Tuple[str, str]], batch_size: int = 8) -> List[dict]:
+        """Debug several (code, log) jobs with one Gemini call per batch_size jobs"""
+        results = [None] * len(jobs)
+
+        # Cached and fast-fixable jobs are answered locally, as in debugg;
+        # only the rest are sent to Gemini, once per distinct (code, log)
+        pending = {}
+        for index, (code, log) in enumerate(jobs):
+            cache_key = _response_cache_key(code, log)
+            if cache_key in pending:
+                pending[cache_key][0].append(index)
+                continue
+
+            cached = _read_cached_response(cache_key)
+            if cached is not None:
+                results[index] = cached
+                continue
+
+            report = self._report_cached(code, log)[1]
+            corrected_code = _fast_fix(code, log)
+            if corrected_code is not None:
+                results[index] = {"report": report, "corrected_code": corrected_code}
+                continue
+
+            pending[cache_key] = ([index], code, log, report)
+
+        tasks = list(pending.items())
+        for start in range(0, len(tasks), batch_size):
+            batch = tasks[start:start + batch_size]
+
+            prompt = (
+                "Return a JSON array of strings. For each task below, in order, output "
+                "the complete corrected code without any comments or explanations.\n"
+                + "\n".join(
+                    f"Task {number}:\nCODE:\n{code}\nLOG:\n{log}"
+                    for number, (_, (_, code, log, _)) in enumerate(batch, 1)
+                )
+            )
+            response = _get_genai_client().models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": {"type": "ARRAY", "items": {"type": "STRING"}},
+                }
+            )
+
+            corrected = json.loads(response.text)
+            if len(corrected) != len(batch):
+                raise ValueError(f"Expected {len(batch)} corrected snippets, got {len(corrected)}")
+
+            for (cache_key, (indices, _, _, report)), corrected_code in zip(batch, corrected):
+                debug_result = {"report": report, "corrected_code": corrected_code}
+                _write_cached_response(cache_key, debug_result)
+                for index in indices:
+                    results[index] = dict(debug_result)
+
+        return results
+
+    def _build_correction_prompt(self, code: str, log: str, result: RecommendationResult) -> str:
+        """Build the Gemini prompt asking for the corrected code"""
+        # Only the fields the model needs; the banners, severity and best
+        # practices of the formatted report are for human readers
+        prompt = (
+            "Generate only the corrected code without any comments or explanations. "
+            "Provide the complete working code and nothing else.\n"
+            f"Original code:\n{code}\n"
+            f"Error: {log}\n"
+            f"Suggested fix rationale: {result.explanation}"
         )
-    
-    print("\n" + "=" * 80 + "\n")
+        if result.proposed_fixes:
+            prompt += f"\nProposed fix: {result.proposed_fixes[0]['code']}"
+        return prompt
+
+
+
+if __name__ == "__main__":
+    import asyncio
 
-    # Example 2: Python NameError
-    print("EXAMPLE 2: Python NameError")
-    print("-" * 40)
+    engine = CodeErrorRecommendationEngine()
     
-    code = """
+    examples = [
+        # Example 1: Python ZeroDivisionError
+        ("Python ZeroDivisionError", """
+def divide(a, b):
+    return a / b
+
+result = divide(10, 0)
+""", "ZeroDivisionError: division by zero"),
+
+        # Example 2: Python NameError
+        ("Python NameError", """
 def calculate_total():
     result = price * quantity
     return result
 
 total = calculate_total()
 print(total)
-"""
-    
-    log = "NameError: name 'price' is not defined"
-    
-    print(
-        f"{'-'*30}"
-        f"\n=> Code : \n "
-        f"{code}"
-        f"\n=> Log : \n"
-        f"{log}\n"
-        )
+""", "NameError: name 'price' is not defined"),
+    ]
 
+    # The examples are independent, so their Gemini calls run concurrently
+    results = asyncio.run(engine.debugg_all([(code, log) for _, code, log in examples]))
 
-    result = engine.debugg(code, log)
-    print(
-        f"\n=> report : \n"
-        f"{result['report']}"
-        f"\n=> Corrected code: \n"
-        f"{result['corrected_code']}"
-        )
+    for number, ((title, code, log), result) in enumerate(zip(examples, results), 1):
+        out = ["", "=" * 80, ""] if number > 1 else []
+        out += [
+            f"EXAMPLE {number}: {title}",
+            "-" * 40,
+            "-" * 30,
+            "=> Code : ",
+            f" {code}",
+            "=> Log : ",
+            log,
+            "",
+            "",
+            "=> report : ",
+            result['report'],
+            "=> Corrected code: ",
+            result['corrected_code'],
+        ]
+        sys.stdout.write("\n".join(out) + "\n")
@@ -0,0 +1,146 @@
+from recommendation_engine_v3 import _fast_fix
+
+ZERO_DIVISION_LOG = (
+    'Traceback (most recent call last):\n'
+    '  File "main.py", line 6, in <module>\n'
+    '    print(average(totals, count))\n'
+    '  File "main.py", line 3, in average\n'
+    '    return total / count\n'
+    'ZeroDivisionError: division by zero'
+)
+
+
+def name_error(name):
+    return f"NameError: name '{name}' is not defined"
+
+
+# ZeroDivisionError
+
+def test_zero_division_guards_only_the_reported_line():
+    code = (
+        "def average(total, count):\n"
+        "    ratio = width / height\n"
+        "    return total / count\n"
+    )
+    assert _fast_fix(code, ZERO_DIVISION_LOG) == (
+        "def average(total, count):\n"
+        "    ratio = width / height\n"
+        "    return total / count if count != 0 else float('inf')\n"
+    )
+
+
+def test_zero_division_keeps_comments_and_blank_lines():
+    code = (
+        "# averages\n"
+        "\n"
+        "x = sum(values) / n  # mean\n"
+    )
+    log = 'File "main.py", line 3, in <module>\nZeroDivisionError: division by zero'
+    assert _fast_fix(code, log) == (
+        "# averages\n"
+        "\n"
+        "x = sum(values) / n if n != 0 else float('inf')  # mean\n"
+    )
+
+
+def test_zero_division_parenthesizes_guard_inside_expression():
+    code = "y = a / b + 1\n"
+    log = "ZeroDivisionError: division by zero at line 1"
+    assert _fast_fix(code, log) == "y = (a / b if b != 0 else float('inf')) + 1\n"
+
+
+def test_zero_division_guards_attribute_divisor():
+    code = "print(total / self.count)\n"
+    log = "ZeroDivisionError: division by zero at line 1"
+    assert _fast_fix(code, log) == "print(total / self.count if self.count != 0 else float('inf'))\n"
+
+
+def test_zero_division_without_line_is_left_to_gemini():
+    assert _fast_fix("x = a / b\n", "ZeroDivisionError: division by zero") is None
+
+
+def test_zero_division_floor_division_is_left_to_gemini():
+    log = "ZeroDivisionError: integer division or modulo by zero at line 1"
+    assert _fast_fix("pages = items // per_page\n", log) is None
+
+
+def test_zero_division_ambiguous_line_is_left_to_gemini():
+    log = "ZeroDivisionError: division by zero at line 1"
+    assert _fast_fix("x = a / b + c / d\n", log) is None
+
+
+def test_zero_division_computed_divisor_is_left_to_gemini():
+    log = "ZeroDivisionError: division by zero at line 1"
+    assert _fast_fix("x = a / (b - c)\n", log) is None
+
+
+def test_zero_division_patch_that_breaks_fstring_is_left_to_gemini():
+    log = "ZeroDivisionError: division by zero at line 1"
+    assert _fast_fix("print(f'{a / b}')\n", log) is None
+
+
+# NameError
+
+def test_name_typo_uses_name_defined_in_code():
+    code = (
+        "total = 0\n"
+        "# add one\n"
+        "print(totl + 1)\n"
+    )
+    assert _fast_fix(code, name_error("totl")) == (
+        "total = 0\n"
+        "# add one\n"
+        "print(total + 1)\n"
+    )
+
+
+def test_name_typo_uses_parameter_of_enclosing_function():
+    code = "def area(width, height):\n    return widht * height\n"
+    assert _fast_fix(code, name_error("widht")) == "def area(width, height):\n    return width * height\n"
+
+
+def test_name_typo_ignores_names_local_to_another_scope():
+    code = (
+        "def area(width, height):\n"
+        "    return width * height\n"
+        "\n"
+        "print(area(widht, 3))\n"
+    )
+    assert _fast_fix(code, name_error("widht")) is None
+
+
+def test_name_typo_ignores_class_attributes_inside_methods():
+    code = (
+        "class Shape:\n"
+        "    sides = 4\n"
+        "\n"
+        "    def count(self):\n"
+        "        return sidse\n"
+    )
+    assert _fast_fix(code, name_error("sidse")) is None
+
+
+def test_name_typo_never_becomes_a_builtin():
+    assert _fast_fix("print(lst)\n", name_error("lst")) is None
+    assert _fast_fix("d = dic()\n", name_error("dic")) is None
+    assert _fast_fix("x = inpt('?')\n", name_error("inpt")) is None
+
+
+def test_name_typo_handles_non_ascii_names():
+    code = "größe_total = 1\nprint(größe_totl)  # ü\n"
+    assert _fast_fix(code, name_error("größe_totl")) == "größe_total = 1\nprint(größe_total)  # ü\n"
+
+
+def test_name_typo_without_close_name_is_left_to_gemini():
+    code = "def calculate_total():\n    return price * quantity\n"
+    assert _fast_fix(code, name_error("price")) is None
+
+
+# Shared
+
+def test_unparseable_code_is_left_to_gemini():
+    assert _fast_fix("def broken(:\n", name_error("x")) is None
+
+
+def test_unrecognized_error_is_left_to_gemini():
+    assert _fast_fix("x = 1\n", "TypeError: bad operand") is None